@@ -1,9 +1,32 @@
 import streamlit as st
 import pandas as pd
 
-from fpl_api import get_players_data, get_teams_data, get_fixtures_data, get_next_gameweek
+from fpl_api import (
+    get_players_data,
+    get_teams_data,
+    get_fixtures_data,
+    get_next_gameweek,
+    get_current_gameweek,
+    get_total_players,
+    get_data_version,
+)
 from data_processor import process_player_data, get_positions_dict
-from visualization import plot_player_history, plot_form_vs_price, plot_team_strength_comparison
+from metrics import get_player_metrics, add_metric_columns, PER_90_COLUMNS
+from price_predictor import get_transfer_store, predict_price_changes
+from team_cube import get_team_cube, CUBE_METRICS
+from simulator import build_simulation_model, simulate_points, summarise_simulation, squad_points_distribution
+from visualization import (
+    plot_player_history,
+    plot_form_vs_price,
+    plot_team_strength_comparison,
+    plot_rolling_form,
+    plot_per_90_leaders,
+    plot_price_change_predictions,
+    plot_squad_points_distribution,
+    plot_player_points_ranges,
+    plot_team_position_breakdown,
+    plot_team_output_comparison,
+)
 from utils import filter_players, get_team_logo_url, get_player_image_url
 
 st.set_page_config(
@@ -18,6 +41,8 @@ st.markdown("Track player performance stats and make informed FPL decisions.")
 
 with st.spinner("Loading FPL data..."):
     try:
+        # Read before the data so the version never runs ahead of it
+        data_version = get_data_version()
         players_data = get_players_data()
         teams_data = get_teams_data()
         fixtures_data = get_fixtures_data()
@@ -32,6 +57,24 @@ with st.spinner("Loading FPL data..."):
         st.error(f"Error loading data: {str(e)}")
         st.stop()
 
+if players_df.empty:
+    st.error(
+        "No FPL data available: the API could not be reached and there is no local snapshot. "
+        "Run `python snapshot.py refresh` to create one."
+    )
+    st.stop()
+
+# Price predictions are optional, so a storage error only disables Price Change Watch
+price_predictions_available = True
+try:
+    transfer_store = get_transfer_store()
+    transfer_store.append(players_data)
+    price_predictions = predict_price_changes(transfer_store, get_total_players())
+    players_df = players_df.merge(price_predictions, left_on='id', right_index=True, how='left')
+except Exception as e:
+    price_predictions_available = False
+    st.sidebar.warning(f"Price Change Watch unavailable: {str(e)}")
+
 st.sidebar.header("Filter Players")
 
 all_teams = sorted(players_df['team_name'].unique())
@@ -49,7 +92,7 @@ selected_positions = all_positions if selected_position_option == "All Positions
 
 plot_option = st.sidebar.selectbox(
     "Select plot to display:",
-    ("Price vs Form", "Team Strength Comparison")
+    ("Price vs Form", "Team Strength Comparison", "Rolling Form", "Per 90 Leaders", "Price Change Watch", "Points Simulation", "Team Output Breakdown")
 )
 
 min_price = float(players_df['price'].min())
@@ -107,6 +150,57 @@ elif plot_option == "Team Strength Comparison":
     team_strength_fig = plot_team_strength_comparison(teams_data)
     st.plotly_chart(team_strength_fig, use_container_width=True)
 
+elif plot_option in ("Rolling Form", "Per 90 Leaders"):
+    with st.spinner("Loading player histories..."):
+        rolling_df, metrics_df = get_player_metrics(get_current_gameweek())
+    rolling_df = rolling_df[rolling_df['element'].isin(filtered_df['id'])]
+    filtered_df = add_metric_columns(filtered_df, metrics_df)
+
+    if plot_option == "Rolling Form":
+        rolling_form_fig = plot_rolling_form(rolling_df, filtered_df)
+        st.plotly_chart(rolling_form_fig, use_container_width=True)
+    else:
+        per_90_metric = st.selectbox("Per 90 metric", list(PER_90_COLUMNS.values()), index=0)
+        per_90_fig = plot_per_90_leaders(filtered_df, per_90_metric)
+        st.plotly_chart(per_90_fig, use_container_width=True)
+
+elif plot_option == "Price Change Watch":
+    if price_predictions_available:
+        price_change_fig = plot_price_change_predictions(filtered_df)
+        st.plotly_chart(price_change_fig, use_container_width=True)
+    else:
+        st.info("Price change predictions are unavailable because the transfer history could not be stored.")
+
+elif plot_option == "Points Simulation":
+    squad_size = st.slider("Players to simulate (top by total points)", 1, 15, 15)
+    n_trials = st.slider("Simulated trials", 1000, 50000, 10000, 1000)
+
+    squad_df = filtered_df.nlargest(squad_size, 'total_points')
+    simulation_model = build_simulation_model(
+        squad_df,
+        players_df,
+        teams_data,
+        fixtures_data,
+        [next_gameweek],
+        get_current_gameweek()
+    )
+    samples = simulate_points(simulation_model, n_trials=n_trials)
+    simulation_summary = summarise_simulation(samples, simulation_model['player_ids'])
+    squad_totals, squad_percentiles = squad_points_distribution(samples)
+
+    st.plotly_chart(plot_squad_points_distribution(squad_totals, squad_percentiles), use_container_width=True)
+    st.plotly_chart(plot_player_points_ranges(simulation_summary, squad_df), use_container_width=True)
+
+elif plot_option == "Team Output Breakdown":
+    cube_metric = st.selectbox("Team metric", CUBE_METRICS, index=0)
+    team_cube = get_team_cube(players_df, data_version)
+
+    team_breakdown_fig = plot_team_position_breakdown(team_cube, cube_metric)
+    st.plotly_chart(team_breakdown_fig, use_container_width=True)
+
+    team_output_fig = plot_team_output_comparison(team_cube, teams_data, cube_metric)
+    st.plotly_chart(team_output_fig, use_container_width=True)
+
 
 cols_per_row = 3
 num_players = len(filtered_df)
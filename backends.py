@@ -0,0 +1,370 @@
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger("fpl")
+
+CACHE_BACKEND_ENV = "FPL_CACHE_BACKEND"
+CACHE_DIR_ENV = "FPL_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(".fpl_cache", "data")
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MEMORY_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 1024 * 1024 * 1024
+
+_MISSING = object()
+
+def _normalise(value):
+    """
+    Convert NumPy scalars to Python ones so that, e.g., np.int64(5) and 5 share a key
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, list)):
+        return type(value)(_normalise(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _normalise(item) for key, item in value.items()}
+    return value
+
+def _make_key(func, args, kwargs):
+    """
+    Build a stable cache key from a function and its arguments
+    """
+    payload = pickle.dumps(
+        (_normalise(args), sorted(_normalise(kwargs).items())),
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+    return f"{func.__module__}.{func.__qualname__}-{hashlib.sha1(payload).hexdigest()}"
+
+class CacheBackend:
+    """
+    Base class for cache backends storing pickled values with a TTL
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, data, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def call(self, func, ttl, args, kwargs):
+        """
+        Return the cached result of func(*args, **kwargs), computing it on a miss
+        """
+        try:
+            key = _make_key(func, args, kwargs)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return func(*args, **kwargs)
+
+        data = self.get(key)
+        if data is not _MISSING:
+            return pickle.loads(data)
+
+        value = func(*args, **kwargs)
+        # The data layer returns None on failure; caching it would hide recovery
+        if value is None:
+            return value
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return value
+        self.set(key, data, ttl)
+        return value
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL and entry-count and size limits
+
+    Values are stored pickled, so callers always get a fresh copy and the
+    byte size used for eviction is exact.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, data = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return _MISSING
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key, data, ttl):
+        if len(data) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, data)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, data = self._entries.pop(key)
+        self._bytes -= len(data)
+
+class DiskCache(CacheBackend):
+    """
+    Cache of pickle files in a directory, shared between processes
+
+    Expiry time is stored with each entry. When the directory grows past
+    max_bytes the least recently read entries are deleted first. The size is
+    tracked as a running estimate from one directory scan, so the directory
+    is only scanned again when the estimate passes the limit.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+
+        if expires_at is not None and expires_at <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return _MISSING
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def set(self, key, data, ttl):
+        os.makedirs(self.directory, exist_ok=True)
+        expires_at = time.time() + ttl if ttl else None
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((expires_at, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        try:
+            size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._total_bytes()
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._bytes = self._evict()
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        with self._lock:
+            self._bytes = None
+
+    def _entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pkl')]
+        except OSError:
+            return []
+
+    def _stats(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _total_bytes(self):
+        return sum(size for _, size, _ in self._stats())
+
+    def _evict(self):
+        """
+        Delete the least recently read entries until the directory fits in max_bytes
+
+        Returns:
+            Size of the directory after eviction, including writes by other processes
+        """
+        entries = self._stats()
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+        return total_bytes
+
+class _FailedResult(Exception):
+    """
+    Raised inside st.cache_data so that a None result is returned but not cached
+    """
+
+def _raise_on_none(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        value = func(*args, **kwargs)
+        if value is None:
+            raise _FailedResult()
+        return value
+    return wrapper
+
+class StreamlitCache(CacheBackend):
+    """
+    Delegates to st.cache_data, for use inside a running Streamlit app
+    """
+
+    def __init__(self):
+        self._wrapped = {}
+        self._lock = threading.Lock()
+
+    def call(self, func, ttl, args, kwargs):
+        import streamlit as st
+
+        with self._lock:
+            wrapped = self._wrapped.get(func)
+            if wrapped is None:
+                wrapped = st.cache_data(ttl=ttl)(_raise_on_none(func))
+                self._wrapped[func] = wrapped
+        try:
+            return wrapped(*args, **kwargs)
+        except _FailedResult:
+            return None
+
+    def clear(self):
+        import streamlit as st
+
+        st.cache_data.clear()
+
+class LoggingReporter:
+    """
+    Reports data-layer errors and warnings through the 'fpl' logger
+    """
+
+    def error(self, message):
+        logger.error(message)
+
+    def warning(self, message):
+        logger.warning(message)
+
+class StreamlitReporter:
+    """
+    Reports data-layer errors and warnings in the Streamlit UI
+    """
+
+    def error(self, message):
+        import streamlit as st
+
+        st.error(message)
+
+    def warning(self, message):
+        import streamlit as st
+
+        st.warning(message)
+
+_cache = None
+_reporter = None
+
+def _in_streamlit():
+    try:
+        from streamlit import runtime
+    except ImportError:
+        return False
+    return runtime.exists()
+
+def _default_cache():
+    backend = os.environ.get(CACHE_BACKEND_ENV, "").lower()
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "disk":
+        return DiskCache()
+    if backend == "streamlit" or _in_streamlit():
+        return StreamlitCache()
+    return MemoryCache()
+
+def configure(cache=None, reporter=None):
+    """
+    Set the cache backend and reporter used by the data layer
+
+    Anything left as None is chosen on first use: FPL_CACHE_BACKEND
+    ('memory', 'disk' or 'streamlit') if set, otherwise the Streamlit
+    backends inside a running app and MemoryCache with logging elsewhere.
+    """
+    global _cache, _reporter
+    _cache = cache
+    _reporter = reporter
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = _default_cache()
+    return _cache
+
+def get_reporter():
+    global _reporter
+    if _reporter is None:
+        _reporter = StreamlitReporter() if _in_streamlit() else LoggingReporter()
+    return _reporter
+
+def report_error(message):
+    get_reporter().error(message)
+
+def report_warning(message):
+    get_reporter().warning(message)
+
+def cached(ttl=None):
+    """
+    Cache a module-level function's results in the configured backend
+
+    The decorated function stays a plain module-level function, so it can be
+    pickled and called from process pool workers.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_cache().call(func, ttl, args, kwargs)
+        return wrapper
+    return decorator
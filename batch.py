@@ -0,0 +1,80 @@
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from backends import configure, DiskCache, LoggingReporter
+from fpl_api import get_bootstrap_data, get_players_data, get_fixtures_data, get_player_history
+from price_predictor import get_transfer_store
+
+DEFAULT_WORKERS = 4
+DEFAULT_DELAY = 0.1
+
+def _init_worker(cache_dir):
+    configure(cache=DiskCache(cache_dir), reporter=LoggingReporter())
+
+def _fetch_history(player_id, delay):
+    get_player_history(player_id)
+    time.sleep(delay)
+
+def precompute(cache_dir=None, workers=DEFAULT_WORKERS, delay=DEFAULT_DELAY):
+    """
+    Warm the disk cache with API data and player histories outside the UI
+
+    Player histories are fetched in a process pool; every worker writes to the
+    same disk cache, so a Streamlit app started with FPL_CACHE_BACKEND=disk
+    computes metrics for any player selection without refetching. A transfer
+    snapshot is also recorded for the price change predictor.
+
+    Args:
+        cache_dir: Disk cache directory, defaults to FPL_CACHE_DIR
+        workers: Number of worker processes for the history fetch
+        delay: Seconds each worker waits between element-summary requests
+
+    Returns:
+        Number of players whose histories were fetched
+    """
+    cache = DiskCache(cache_dir)
+    configure(cache=cache, reporter=LoggingReporter())
+
+    if get_bootstrap_data() is None:
+        return 0
+    get_fixtures_data()
+
+    players_data = get_players_data()
+    player_ids = tuple(sorted(player['id'] for player in players_data))
+
+    fetch = partial(_fetch_history, delay=delay)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache.directory,)) as executor:
+            list(executor.map(fetch, player_ids, chunksize=16))
+    else:
+        for player_id in player_ids:
+            fetch(player_id)
+
+    get_transfer_store().append(players_data)
+    return len(player_ids)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run FPL data jobs without the Streamlit UI")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    precompute_parser = subparsers.add_parser('precompute', help="Warm the disk cache with API data and player histories")
+    precompute_parser.add_argument('--cache-dir', default=None, help="Disk cache directory")
+    precompute_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Worker processes for fetching player histories")
+    precompute_parser.add_argument('--delay', type=float, default=DEFAULT_DELAY, help="Seconds each worker waits between history requests")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    n_players = precompute(args.cache_dir, workers=args.workers, delay=args.delay)
+    if n_players == 0:
+        print("No player data available", file=sys.stderr)
+        return 1
+    print(f"Precomputed histories for {n_players} players")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -86,6 +86,9 @@ def process_player_data(players_data, teams_data, fixtures_data):
             'upcoming_fixtures': upcoming_fixtures,
             'avg_fixture_difficulty': avg_difficulty,
             'selected_by_percent': float(player['selected_by_percent'] or 0),
+            'transfers_in_event': player['transfers_in_event'],
+            'transfers_out_event': player['transfers_out_event'],
+            'cost_change_event': player['cost_change_event'] / 10,
         }
         
         processed_players.append(processed_player)
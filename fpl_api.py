@@ -2,7 +2,8 @@ import requests
 import pandas as pd
 import time
 import json
-import streamlit as st
+from backends import cached, report_error, report_warning
+from snapshot import is_offline, load_bootstrap_snapshot, load_fixtures_snapshot, load_player_history_snapshot
 
 # Base URLs for FPL API
 BASE_URL = "https://fantasy.premierleague.com/api/"
@@ -10,20 +11,30 @@ BOOTSTRAP_URL = f"{BASE_URL}bootstrap-static/"
 FIXTURES_URL = f"{BASE_URL}fixtures/"
 PLAYER_HISTORY_URL = f"{BASE_URL}element-summary/"
 
-@st.cache_data(ttl=3600) 
+@cached(ttl=3600) 
 def get_bootstrap_data():
     """
     Get the main FPL bootstrap data including players, teams, and game rules
+
+    Falls back to the offline snapshot if the API is unavailable, and reads
+    only the snapshot when FPL_OFFLINE is set.
     """
+    if is_offline():
+        return load_bootstrap_snapshot()
+
     try:
         response = requests.get(BOOTSTRAP_URL)
         response.raise_for_status()  
         return response.json()
     except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching bootstrap data: {str(e)}")
+        bootstrap_data = load_bootstrap_snapshot()
+        if bootstrap_data is not None:
+            report_warning(f"FPL API unavailable, using offline snapshot: {str(e)}")
+            return bootstrap_data
+        report_error(f"Error fetching bootstrap data: {str(e)}")
         return None
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_players_data():
     """
     Get all player data from the FPL API
@@ -33,7 +44,7 @@ def get_players_data():
         return bootstrap_data.get('elements', [])
     return []
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_teams_data():
     """
     Get all teams data from the FPL API
@@ -43,7 +54,7 @@ def get_teams_data():
         return bootstrap_data.get('teams', [])
     return []
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_positions_data():
     """
     Get position/element_type data from the FPL API
@@ -53,34 +64,68 @@ def get_positions_data():
         return bootstrap_data.get('element_types', [])
     return []
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
+def get_total_players():
+    """
+    Get the total number of registered FPL managers
+    """
+    bootstrap_data = get_bootstrap_data()
+    if bootstrap_data:
+        return bootstrap_data.get('total_players', 0)
+    return 0
+
+@cached(ttl=3600)
+def get_data_version():
+    """
+    Get a token that changes whenever the bootstrap data is refetched
+
+    The bootstrap data is fetched first, so this entry always expires after
+    it and the token moves on at the next call after a refetch.
+    """
+    get_bootstrap_data()
+    return time.time()
+
+@cached(ttl=3600)
 def get_fixtures_data():
     """
     Get fixture data for the season
     """
+    if is_offline():
+        return load_fixtures_snapshot() or []
+
     try:
         response = requests.get(FIXTURES_URL)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        st.error(f"Error fetching fixtures data: {str(e)}")
+        fixtures_data = load_fixtures_snapshot()
+        if fixtures_data is not None:
+            report_warning(f"FPL API unavailable, using offline snapshot: {str(e)}")
+            return fixtures_data
+        report_error(f"Error fetching fixtures data: {str(e)}")
         return []
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_player_history(player_id):
     """
     Get detailed history data for a specific player
     """
+    if is_offline():
+        return load_player_history_snapshot(player_id)
+
     try:
         url = f"{PLAYER_HISTORY_URL}{player_id}/"
         response = requests.get(url)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        st.warning(f"Error fetching player history for player {player_id}: {str(e)}")
+        history_data = load_player_history_snapshot(player_id)
+        if history_data is not None:
+            return history_data
+        report_warning(f"Error fetching player history for player {player_id}: {str(e)}")
         return None
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_current_gameweek():
     """
     Determine the current gameweek from the API data
@@ -100,7 +145,7 @@ def get_current_gameweek():
     
     return 1
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_next_gameweek():
     """
     Determine the next gameweek from the API data
@@ -117,7 +162,7 @@ def get_next_gameweek():
     current_gw = get_current_gameweek()
     return min(current_gw + 1, 38)  
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_team_difficulty_mapping():
     """
     Create a mapping of team ID to their FDR (Fixture Difficulty Rating)
@@ -125,7 +170,7 @@ def get_team_difficulty_mapping():
     teams_data = get_teams_data()
     return {team['id']: team['strength'] for team in teams_data}
 
-@st.cache_data(ttl=3600)
+@cached(ttl=3600)
 def get_upcoming_fixtures(team_id, next_n=3):
     """
     Get upcoming fixtures for a specific team
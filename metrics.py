@@ -0,0 +1,194 @@
+import pandas as pd
+from backends import cached
+from fpl_api import get_player_history, get_players_data
+from utils import safe_ratio
+
+# Columns kept from each element-summary 'history' row
+HISTORY_COLUMNS = [
+    'element',
+    'round',
+    'minutes',
+    'total_points',
+    'goals_scored',
+    'assists',
+    'clean_sheets',
+    'bonus',
+    'expected_goals',
+    'expected_assists',
+    'expected_goal_involvements',
+]
+
+# Season totals converted to per-90 rates
+PER_90_COLUMNS = {
+    'total_points': 'points_per_90',
+    'goals_scored': 'goals_per_90',
+    'assists': 'assists_per_90',
+    'expected_goals': 'xg_per_90',
+    'expected_assists': 'xa_per_90',
+    'expected_goal_involvements': 'xgi_per_90',
+}
+
+# Columns of the per-player summary, in order
+SUMMARY_COLUMNS = list(PER_90_COLUMNS.values()) + [
+    'ewm_form',
+    'last_n_points',
+    'last_n_minutes',
+    'last_n_goal_involvements',
+    'last_n_xgi',
+    'goals_to_xg',
+    'assists_to_xa',
+    'gi_to_xgi',
+]
+
+DEFAULT_FORM_SPAN = 4
+DEFAULT_LAST_N = 5
+
+def build_history_frame(history_rows):
+    """
+    Build a long-format history DataFrame (one row per player per gameweek)
+
+    Args:
+        history_rows: Iterable of 'history' rows from the element-summary endpoint
+
+    Returns:
+        DataFrame with HISTORY_COLUMNS, numeric dtypes, sorted by player and round
+    """
+    history_df = pd.DataFrame(list(history_rows))
+    if history_df.empty:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    history_df = history_df.reindex(columns=HISTORY_COLUMNS)
+    # Expected stats come back from the API as strings
+    history_df = history_df.apply(pd.to_numeric, errors='coerce').fillna(0)
+    history_df[['element', 'round']] = history_df[['element', 'round']].astype(int)
+
+    return history_df.sort_values(['element', 'round'], kind='stable').reset_index(drop=True)
+
+def fetch_history_frame(player_ids):
+    """
+    Fetch element-summary histories for several players into one long-format DataFrame
+    """
+    history_rows = []
+    for player_id in player_ids:
+        history_data = get_player_history(player_id)
+        if history_data and history_data.get('history'):
+            history_rows.extend(history_data['history'])
+    return build_history_frame(history_rows)
+
+def add_rolling_metrics(history_df, span=DEFAULT_FORM_SPAN, last_n=DEFAULT_LAST_N):
+    """
+    Add per-gameweek rolling form columns to a long-format history DataFrame
+
+    All windows are computed per player with grouped window operations, so every
+    player is processed in the same vectorized pass.
+
+    Args:
+        history_df: Output of build_history_frame
+        span: Span of the exponentially weighted points average
+        last_n: Number of gameweeks in the rolling sums
+
+    Returns:
+        Copy of history_df with 'ewm_form', 'rolling_points', 'rolling_minutes'
+        and 'rolling_xgi' columns
+    """
+    df = history_df.copy()
+    if df.empty:
+        for column in ['ewm_form', 'rolling_points', 'rolling_minutes', 'rolling_xgi']:
+            df[column] = pd.Series(dtype=float)
+        return df
+
+    grouped = df.groupby('element', sort=False)
+
+    df['ewm_form'] = (
+        grouped['total_points']
+        .ewm(span=span, adjust=False)
+        .mean()
+        .reset_index(level=0, drop=True)
+    )
+
+    rolling = (
+        grouped[['total_points', 'minutes', 'expected_goal_involvements']]
+        .rolling(last_n, min_periods=1)
+        .sum()
+        .reset_index(level=0, drop=True)
+    )
+    df['rolling_points'] = rolling['total_points']
+    df['rolling_minutes'] = rolling['minutes']
+    df['rolling_xgi'] = rolling['expected_goal_involvements']
+
+    return df
+
+def summarise_player_metrics(rolling_df, last_n=DEFAULT_LAST_N):
+    """
+    Compute one row of derived metrics per player from a long-format history
+
+    Args:
+        rolling_df: Output of add_rolling_metrics
+        last_n: Number of most recent gameweeks in the last-N aggregates
+
+    Returns:
+        DataFrame indexed by player id with per-90 rates, EWM form,
+        last-N aggregates and xG ratios
+    """
+    if rolling_df.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS, index=pd.Index([], name='element'), dtype=float)
+
+    grouped = rolling_df.groupby('element', sort=True)
+    totals = grouped[list(PER_90_COLUMNS) + ['minutes']].sum()
+
+    summary = pd.DataFrame(index=totals.index)
+    for column, per_90_column in PER_90_COLUMNS.items():
+        summary[per_90_column] = safe_ratio(totals[column] * 90, totals['minutes'])
+
+    latest = grouped.tail(1).set_index('element')
+    summary['ewm_form'] = latest['ewm_form']
+
+    recent = grouped.tail(last_n).groupby('element', sort=True)
+    recent_totals = recent[['total_points', 'minutes', 'goals_scored', 'assists', 'expected_goal_involvements']].sum()
+    summary['last_n_points'] = recent_totals['total_points']
+    summary['last_n_minutes'] = recent_totals['minutes']
+    summary['last_n_goal_involvements'] = recent_totals['goals_scored'] + recent_totals['assists']
+    summary['last_n_xgi'] = recent_totals['expected_goal_involvements']
+
+    # Above 1 means a player is outperforming their expected numbers
+    summary['goals_to_xg'] = safe_ratio(totals['goals_scored'], totals['expected_goals'])
+    summary['assists_to_xa'] = safe_ratio(totals['assists'], totals['expected_assists'])
+    summary['gi_to_xgi'] = safe_ratio(
+        totals['goals_scored'] + totals['assists'],
+        totals['expected_goal_involvements']
+    )
+
+    return summary
+
+@cached(ttl=3600)
+def get_player_metrics(gameweek, span=DEFAULT_FORM_SPAN, last_n=DEFAULT_LAST_N):
+    """
+    Get rolling history and summary metrics for every player, cached per gameweek
+
+    Metrics cover every player who has played, so any filtered selection is
+    a subset of one cached result.
+
+    Args:
+        gameweek: Current gameweek, used as the cache key so results refresh
+            once a new gameweek starts
+        span: Span of the exponentially weighted points average
+        last_n: Number of gameweeks in the rolling and last-N aggregates
+
+    Returns:
+        Tuple of (rolling history DataFrame, summary DataFrame indexed by player id)
+    """
+    player_ids = sorted(player['id'] for player in get_players_data() if player['minutes'] > 0)
+    history_df = fetch_history_frame(player_ids)
+    rolling_df = add_rolling_metrics(history_df, span=span, last_n=last_n)
+    summary_df = summarise_player_metrics(rolling_df, last_n=last_n)
+    return rolling_df, summary_df
+
+def add_metric_columns(players_df, summary_df):
+    """
+    Join per-player summary metrics onto the processed players DataFrame
+
+    Every summary column is added, as NaN for players without history, so
+    plots can rely on the columns existing.
+    """
+    summary_df = summary_df.reindex(columns=SUMMARY_COLUMNS).astype(float)
+    return players_df.merge(summary_df, left_on='id', right_index=True, how='left')
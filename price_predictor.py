@@ -0,0 +1,367 @@
+import os
+import threading
+from contextlib import contextmanager
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; only the in-process lock applies there
+    fcntl = None
+
+# Bootstrap 'elements' fields kept in each snapshot
+SNAPSHOT_FIELDS = [
+    'now_cost',
+    'selected_by_percent',
+    'transfers_in_event',
+    'transfers_out_event',
+    'cost_change_event',
+]
+FIELD_INDEX = {field: i for i, field in enumerate(SNAPSHOT_FIELDS)}
+
+PRICE_HISTORY_PATH = os.path.join(".fpl_cache", "transfer_history.npz")
+
+# Four days of snapshots at one per hour; storage is
+# capacity x fields x players x 4 bytes (about 2MB) regardless of uptime
+DEFAULT_CAPACITY = 96
+DEFAULT_MIN_INTERVAL = 15 * 60
+
+PREDICTION_COLUMNS = [
+    'net_transfers_event',
+    'net_transfers_since_change',
+    'net_transfer_ratio',
+    'transfer_velocity',
+    'projected_transfer_ratio',
+    'prediction',
+]
+
+# Approximate net transfers, as a share of current owners, that trigger a
+# price change. FPL does not publish the real thresholds.
+RISE_THRESHOLD = 0.05
+FALL_THRESHOLD = 0.03
+
+# Prices change once a night at roughly 01:30 UK time, which is 00:30 UTC
+# during British Summer Time
+PRICE_UPDATE_TIMEZONE = ZoneInfo("Europe/London")
+PRICE_UPDATE_HOUR = 1
+PRICE_UPDATE_MINUTE = 30
+
+class TransferSnapshotStore:
+    """
+    Fixed-size ring buffer of per-player transfer snapshots
+
+    Values are held as a (field, slot, player_id) float32 array so that every
+    snapshot is one contiguous column block. Once the buffer is full the oldest
+    snapshot is overwritten, so the file on disk never grows beyond capacity.
+    """
+
+    def __init__(self, path=PRICE_HISTORY_PATH, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        # The store is shared by every Streamlit session thread
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return self._count
+
+    def _reset(self):
+        self._timestamps = np.full(self.capacity, np.nan)
+        self._values = np.full((len(SNAPSHOT_FIELDS), self.capacity, 0), np.nan, dtype=np.float32)
+        self._head = 0
+        self._count = 0
+
+    def _load(self):
+        self._reset()
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        with np.load(self.path) as data:
+            timestamps = data['timestamps']
+            values = data['values']
+            head = int(data['head'])
+            count = int(data['count'])
+
+        if values.shape[0] != len(SNAPSHOT_FIELDS):
+            return
+
+        # Replay the stored snapshots oldest first so a changed capacity still loads
+        stored_capacity = len(timestamps)
+        order = (head - count + np.arange(count)) % stored_capacity
+        keep = order[-self.capacity:]
+        self._ensure_width(values.shape[2])
+        self._timestamps[:len(keep)] = timestamps[keep]
+        self._values[:, :len(keep), :] = values[:, keep, :]
+        self._count = len(keep)
+        self._head = self._count % self.capacity
+
+    def _save(self):
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Unique per writer so concurrent saves never replace each other's temp file
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            timestamps=self._timestamps,
+            values=self._values,
+            head=self._head,
+            count=self._count,
+        )
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Hold an exclusive lock on the store file across processes, e.g. the app and a cron job
+        """
+        if not self.path or fcntl is None:
+            yield
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(f"{self.path}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_width(self, width):
+        current_width = self._values.shape[2]
+        if width <= current_width:
+            return
+        padding = np.full((len(SNAPSHOT_FIELDS), self.capacity, width - current_width), np.nan, dtype=np.float32)
+        self._values = np.concatenate([self._values, padding], axis=2)
+
+    def last_timestamp(self):
+        """
+        Get the time of the most recent snapshot, or None if the store is empty
+        """
+        if self._count == 0:
+            return None
+        return float(self._timestamps[(self._head - 1) % self.capacity])
+
+    def _matches_last(self, ids, columns):
+        """
+        Check whether the newest snapshot already holds these values
+
+        The bootstrap payload is cached, so the app often sees the same
+        counters again; recording them under a new time would fake a stall
+        followed by a burst of transfers.
+        """
+        if self._count == 0 or int(ids.max()) >= self._values.shape[2]:
+            return False
+        last_slot = (self._head - 1) % self.capacity
+        return all(
+            np.array_equal(self._values[i, last_slot, ids], columns[field])
+            for field, i in FIELD_INDEX.items()
+        )
+
+    def _should_skip(self, timestamp, ids, columns, min_interval):
+        last = self.last_timestamp()
+        if last is not None and timestamp - last < min_interval:
+            return True
+        return self._matches_last(ids, columns)
+
+    def append(self, players_data, timestamp=None, min_interval=DEFAULT_MIN_INTERVAL):
+        """
+        Record a snapshot of the transfer fields for every player
+
+        Args:
+            players_data: Raw 'elements' list from the bootstrap endpoint
+            timestamp: Snapshot time in seconds since the epoch, defaults to now
+            min_interval: Skip the snapshot if the previous one is more recent than this
+
+        Snapshots whose values match the previous one are skipped as well.
+
+        Returns:
+            True if a snapshot was written, False if it was skipped
+        """
+        if not players_data:
+            return False
+
+        timestamp = time.time() if timestamp is None else timestamp
+        ids = np.fromiter((player['id'] for player in players_data), dtype=np.int64, count=len(players_data))
+        columns = {
+            field: np.array([float(player.get(field) or 0) for player in players_data], dtype=np.float32)
+            for field in FIELD_INDEX
+        }
+
+        with self._lock:
+            # Checked in memory first so skipped snapshots never touch the file
+            if self._should_skip(timestamp, ids, columns, min_interval):
+                return False
+
+            with self._file_lock():
+                if self.path:
+                    # Another process may have appended since this store was loaded
+                    self._load()
+                    if self._should_skip(timestamp, ids, columns, min_interval):
+                        return False
+
+                self._ensure_width(int(ids.max()) + 1)
+
+                slot = self._head
+                self._values[:, slot, :] = np.nan
+                for field, i in FIELD_INDEX.items():
+                    self._values[i, slot, ids] = columns[field]
+                self._timestamps[slot] = timestamp
+
+                self._head = (self._head + 1) % self.capacity
+                self._count = min(self._count + 1, self.capacity)
+                self._save()
+                return True
+
+    def latest(self, n):
+        """
+        Get the most recent snapshots in chronological order
+
+        Args:
+            n: Maximum number of snapshots to return
+
+        Returns:
+            Tuple of (timestamps array, values array shaped field x snapshot x player_id)
+        """
+        with self._lock:
+            n = min(n, self._count)
+            slots = (self._head - n + np.arange(n)) % self.capacity
+            return self._timestamps[slots], self._values[:, slots, :]
+
+@lru_cache(maxsize=None)
+def get_transfer_store():
+    """
+    Get the shared on-disk transfer snapshot store
+    """
+    return TransferSnapshotStore()
+
+def hours_until_price_update(now=None):
+    """
+    Hours from now until the next nightly price update
+    """
+    now = now or datetime.now(timezone.utc)
+    local_now = now.astimezone(PRICE_UPDATE_TIMEZONE)
+    update_date = local_now.date()
+    if (local_now.hour, local_now.minute) >= (PRICE_UPDATE_HOUR, PRICE_UPDATE_MINUTE):
+        update_date += timedelta(days=1)
+    update_time = datetime(
+        update_date.year, update_date.month, update_date.day,
+        PRICE_UPDATE_HOUR, PRICE_UPDATE_MINUTE,
+        tzinfo=PRICE_UPDATE_TIMEZONE
+    )
+    # Compare in UTC; subtracting two times in the same zone ignores DST changes
+    return (update_time.astimezone(timezone.utc) - now.astimezone(timezone.utc)).total_seconds() / 3600
+
+def _net_transfers_since_change(values):
+    """
+    Net transfers since each player's last price change or transfer deadline
+
+    A price change resets the change threshold, so transfers made before it
+    no longer count. The stored snapshots are scanned for the latest point
+    where cost_change_event moved (baseline is the net total at that
+    snapshot) or the event counters reset at a deadline (baseline is 0).
+
+    Args:
+        values: Snapshot array shaped field x snapshot x player_id, oldest first
+
+    Returns:
+        Array of net transfers per player id
+    """
+    transfers_in = values[FIELD_INDEX['transfers_in_event']].astype(float)
+    transfers_out = values[FIELD_INDEX['transfers_out_event']].astype(float)
+    cost_change = values[FIELD_INDEX['cost_change_event']].astype(float)
+    net = transfers_in - transfers_out
+
+    reset = np.zeros(net.shape, dtype=bool)
+    changed = np.zeros(net.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        reset[1:] = (transfers_in[1:] < transfers_in[:-1]) | (transfers_out[1:] < transfers_out[:-1])
+        changed[1:] = (cost_change[1:] != cost_change[:-1]) & ~np.isnan(cost_change[:-1]) & ~np.isnan(cost_change[1:])
+
+    event = reset | changed
+    n_snapshots = net.shape[0]
+    last_event = n_snapshots - 1 - np.argmax(event[::-1], axis=0)
+    has_event = event.any(axis=0)
+
+    baseline_net = np.take_along_axis(net, last_event[None, :], axis=0)[0]
+    baseline_reset = np.take_along_axis(reset, last_event[None, :], axis=0)[0]
+    baseline = np.where(has_event & ~baseline_reset, baseline_net, 0)
+    return net[-1] - baseline
+
+def predict_price_changes(store, total_players, hours_ahead=None):
+    """
+    Flag likely price risers and fallers from net-transfer momentum
+
+    Net transfers since each player's last price change are scaled by their
+    owner count, and the transfer rate between the two latest snapshots is
+    projected forward to the next price update. All players are scored at
+    once on the snapshot arrays.
+
+    Args:
+        store: TransferSnapshotStore with at least one snapshot
+        total_players: Total number of FPL managers, used to turn ownership into owners
+        hours_ahead: Hours to project forward, defaults to the time until the next update
+
+    Returns:
+        DataFrame indexed by player id with net transfers, momentum and a
+        'prediction' of 'Rise', 'Fall' or 'Hold'
+    """
+    timestamps, values = store.latest(store.capacity)
+    if len(timestamps) == 0:
+        return pd.DataFrame(columns=PREDICTION_COLUMNS, index=pd.Index([], name='id'))
+
+    hours_ahead = hours_until_price_update() if hours_ahead is None else hours_ahead
+
+    current = values[:, -1, :].astype(float)
+    transfers_in = current[FIELD_INDEX['transfers_in_event']]
+    transfers_out = current[FIELD_INDEX['transfers_out_event']]
+    net_transfers = transfers_in - transfers_out
+    net_since_change = _net_transfers_since_change(values)
+
+    owners = np.maximum(current[FIELD_INDEX['selected_by_percent']] / 100 * max(total_players, 1), 1)
+
+    if len(timestamps) >= 2:
+        previous = values[:, -2, :].astype(float)
+        prev_in = previous[FIELD_INDEX['transfers_in_event']]
+        prev_out = previous[FIELD_INDEX['transfers_out_event']]
+        elapsed_hours = max((timestamps[-1] - timestamps[-2]) / 3600, 1 / 60)
+
+        # Event transfer counters reset at each deadline, so a drop means a new window
+        reset = np.isnan(prev_in) | (transfers_in < prev_in) | (transfers_out < prev_out)
+        prev_net = np.where(reset, 0, prev_in - prev_out)
+        velocity = (net_transfers - prev_net) / elapsed_hours
+    else:
+        velocity = np.zeros_like(net_transfers)
+
+    net_ratio = net_since_change / owners
+    projected_ratio = (net_since_change + velocity * hours_ahead) / owners
+
+    prediction = np.select(
+        [projected_ratio >= RISE_THRESHOLD, projected_ratio <= -FALL_THRESHOLD],
+        ['Rise', 'Fall'],
+        default='Hold'
+    )
+
+    present = ~np.isnan(transfers_in)
+    predictions_df = pd.DataFrame({
+        'net_transfers_event': net_transfers,
+        'net_transfers_since_change': net_since_change,
+        'net_transfer_ratio': net_ratio,
+        'transfer_velocity': velocity,
+        'projected_transfer_ratio': projected_ratio,
+        'prediction': prediction,
+    })
+    predictions_df.index.name = 'id'
+    return predictions_df[present]
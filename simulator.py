@@ -0,0 +1,244 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from utils import safe_ratio
+
+# FPL scoring rules by position
+GOAL_POINTS = {'Goalkeeper': 10, 'Defender': 6, 'Midfielder': 5, 'Forward': 4}
+CLEAN_SHEET_POINTS = {'Goalkeeper': 4, 'Defender': 4, 'Midfielder': 1, 'Forward': 0}
+CONCEDE_PENALTY_POSITIONS = ['Goalkeeper', 'Defender']
+ASSIST_POINTS = 3
+APPEARANCE_POINTS = 2
+MAX_BONUS_POINTS = 3
+
+# Average goals per match for a home and away side of league-average strength
+BASE_HOME_GOALS = 1.5
+BASE_AWAY_GOALS = 1.2
+
+DEFAULT_TRIALS = 10000
+# Trials sampled per batch; peak memory per batch is roughly
+# batch_size x player appearances x 8 bytes for each intermediate array
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+def build_fixture_goal_rates(teams_data, fixtures_data, gameweeks):
+    """
+    Derive expected goals for each side of the fixtures in the given gameweeks
+
+    Rates scale a league-average scoreline by the attacking side's strength_attack
+    and the defending side's strength_defence, relative to the league means.
+
+    Args:
+        teams_data: List of team data from FPL API
+        fixtures_data: List of fixture data from FPL API
+        gameweeks: Gameweeks to include
+
+    Returns:
+        DataFrame with one row per unplayed fixture and 'team_h', 'team_a',
+        'home_rate' and 'away_rate' columns
+    """
+    teams_df = pd.DataFrame(teams_data).set_index('id')
+    fixtures_df = pd.DataFrame(fixtures_data)
+    if fixtures_df.empty:
+        return pd.DataFrame(columns=['team_h', 'team_a', 'home_rate', 'away_rate'])
+
+    fixtures_df = fixtures_df[fixtures_df['event'].isin(gameweeks) & ~fixtures_df['finished'].astype(bool)]
+    fixtures_df = fixtures_df[['event', 'team_h', 'team_a']].reset_index(drop=True)
+
+    mean_attack = teams_df[['strength_attack_home', 'strength_attack_away']].to_numpy().mean()
+    mean_defence = teams_df[['strength_defence_home', 'strength_defence_away']].to_numpy().mean()
+
+    home = teams_df.loc[fixtures_df['team_h']]
+    away = teams_df.loc[fixtures_df['team_a']]
+
+    fixtures_df['home_rate'] = (
+        BASE_HOME_GOALS
+        * home['strength_attack_home'].to_numpy() / mean_attack
+        * mean_defence / away['strength_defence_away'].to_numpy()
+    )
+    fixtures_df['away_rate'] = (
+        BASE_AWAY_GOALS
+        * away['strength_attack_away'].to_numpy() / mean_attack
+        * mean_defence / home['strength_defence_home'].to_numpy()
+    )
+
+    return fixtures_df
+
+def build_simulation_model(squad_df, players_df, teams_data, fixtures_data, gameweeks, games_played):
+    """
+    Build the arrays needed to simulate points for a squad
+
+    Player rates come from season totals: each player's share of their team's
+    goals and assists, their chance of playing from minutes per available match,
+    and their average bonus per 90, which sets the chance of each bonus point.
+
+    Args:
+        squad_df: Processed player rows to simulate
+        players_df: Full processed player DataFrame, used for team goal totals
+        teams_data: List of team data from FPL API
+        fixtures_data: List of fixture data from FPL API
+        gameweeks: Gameweeks to simulate
+        games_played: Number of gameweeks played so far
+
+    Returns:
+        Dictionary of NumPy arrays describing players, fixtures and appearances.
+        It holds only plain arrays so it can be sent to worker processes.
+    """
+    fixtures_df = build_fixture_goal_rates(teams_data, fixtures_data, gameweeks)
+    squad_df = squad_df.reset_index(drop=True)
+
+    team_goals = players_df.groupby('team_id')['goals_scored'].sum()
+    squad_team_goals = squad_df['team_id'].map(team_goals).fillna(0).to_numpy()
+
+    goal_share = np.clip(safe_ratio(squad_df['goals_scored'], squad_team_goals), 0, 1)
+    assist_share = np.clip(safe_ratio(squad_df['assists'], squad_team_goals), 0, 1)
+    # Assists are drawn from the team goals the player did not score
+    assist_share = np.clip(safe_ratio(assist_share, 1 - goal_share), 0, 1)
+
+    play_prob = np.clip(safe_ratio(squad_df['minutes'], 90 * max(games_played, 1)), 0, 1)
+    bonus_per_match = np.clip(safe_ratio(squad_df['bonus'] * 90, squad_df['minutes']), 0, MAX_BONUS_POINTS)
+    # Bonus is drawn as Binomial(3, p), so its mean matches the player's bonus per 90
+    bonus_prob = bonus_per_match / MAX_BONUS_POINTS
+
+    # One row per player per fixture their team plays; side 0 is home, 1 is away
+    team_fixtures = pd.concat([
+        pd.DataFrame({'team_id': fixtures_df['team_h'], 'fixture': fixtures_df.index, 'side': 0}),
+        pd.DataFrame({'team_id': fixtures_df['team_a'], 'fixture': fixtures_df.index, 'side': 1}),
+    ])
+    appearances = (
+        squad_df[['team_id']]
+        .rename_axis('player')
+        .reset_index()
+        .merge(team_fixtures, on='team_id')
+        .sort_values(['player', 'fixture'], kind='stable')
+    )
+
+    return {
+        'player_ids': squad_df['id'].to_numpy(),
+        'goal_rates': fixtures_df[['home_rate', 'away_rate']].to_numpy(dtype=float),
+        'goal_share': goal_share,
+        'assist_share': assist_share,
+        'play_prob': play_prob,
+        'bonus_prob': bonus_prob,
+        'goal_points': squad_df['position'].map(GOAL_POINTS).fillna(0).to_numpy(dtype=float),
+        'clean_sheet_points': squad_df['position'].map(CLEAN_SHEET_POINTS).fillna(0).to_numpy(dtype=float),
+        'concede_penalty': squad_df['position'].isin(CONCEDE_PENALTY_POSITIONS).to_numpy(),
+        'appearance_player': appearances['player'].to_numpy(dtype=np.int64),
+        'appearance_fixture': appearances['fixture'].to_numpy(dtype=np.int64),
+        'appearance_side': appearances['side'].to_numpy(dtype=np.int64),
+    }
+
+def _simulate_batch(model, n_trials, seed):
+    """
+    Sample points for one batch of trials
+
+    Returns:
+        float32 array shaped (n_trials, number of players)
+    """
+    rng = np.random.default_rng(seed)
+    n_players = len(model['player_ids'])
+    player = model['appearance_player']
+    fixture = model['appearance_fixture']
+    side = model['appearance_side']
+
+    points = np.zeros((n_trials, n_players), dtype=np.float32)
+    if len(player) == 0:
+        return points
+
+    goals = rng.poisson(model['goal_rates'], size=(n_trials,) + model['goal_rates'].shape)
+    goals_for = goals[:, fixture, side]
+    goals_against = goals[:, fixture, 1 - side]
+
+    plays = rng.random(goals_for.shape) < model['play_prob'][player]
+    player_goals = rng.binomial(goals_for, model['goal_share'][player] * plays)
+    player_assists = rng.binomial(goals_for - player_goals, model['assist_share'][player] * plays)
+    player_bonus = rng.binomial(MAX_BONUS_POINTS, model['bonus_prob'][player] * plays)
+
+    appearance_points = (
+        plays * APPEARANCE_POINTS
+        + player_bonus
+        + player_goals * model['goal_points'][player]
+        + player_assists * ASSIST_POINTS
+        + (plays & (goals_against == 0)) * model['clean_sheet_points'][player]
+        - (plays & model['concede_penalty'][player]) * (goals_against // 2)
+    )
+
+    # Appearances are sorted by player, so each player's fixtures are one contiguous run
+    players_with_fixtures, starts = np.unique(player, return_index=True)
+    points[:, players_with_fixtures] = np.add.reduceat(appearance_points, starts, axis=1)
+    return points
+
+def simulate_points(model, n_trials=DEFAULT_TRIALS, batch_size=DEFAULT_BATCH_SIZE, n_workers=None, seed=None):
+    """
+    Run a Monte Carlo simulation of points for every player in a model
+
+    Trials are split into fixed-size batches so memory stays bounded. With
+    n_workers above 1 the batches run in a process pool.
+
+    Args:
+        model: Output of build_simulation_model
+        n_trials: Total number of simulated trials
+        batch_size: Trials sampled per batch
+        n_workers: Number of worker processes, None or 1 runs in this process
+        seed: Seed for reproducible results
+
+    Returns:
+        float32 array of simulated points shaped (n_trials, number of players)
+    """
+    batch_sizes = [batch_size] * (n_trials // batch_size)
+    if n_trials % batch_size:
+        batch_sizes.append(n_trials % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    samples = np.empty((n_trials, len(model['player_ids'])), dtype=np.float32)
+    offsets = np.concatenate([[0], np.cumsum(batch_sizes)])
+
+    if n_workers and n_workers > 1 and len(batch_sizes) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            batches = executor.map(_simulate_batch, repeat(model), batch_sizes, seeds)
+            for i, batch in enumerate(batches):
+                samples[offsets[i]:offsets[i + 1]] = batch
+    else:
+        for i, (size, batch_seed) in enumerate(zip(batch_sizes, seeds)):
+            samples[offsets[i]:offsets[i + 1]] = _simulate_batch(model, size, batch_seed)
+
+    return samples
+
+def summarise_simulation(samples, player_ids, percentiles=DEFAULT_PERCENTILES):
+    """
+    Summarise simulated points per player
+
+    Args:
+        samples: Output of simulate_points
+        player_ids: Player IDs matching the sample columns
+        percentiles: Percentiles to report
+
+    Returns:
+        DataFrame indexed by player id with mean, standard deviation and
+        one 'p<N>' column per percentile
+    """
+    summary_df = pd.DataFrame({
+        'mean_points': samples.mean(axis=0),
+        'std_points': samples.std(axis=0),
+    }, index=pd.Index(player_ids, name='id'))
+
+    if len(samples):
+        percentile_values = np.percentile(samples, percentiles, axis=0)
+        for percentile, values in zip(percentiles, percentile_values):
+            summary_df[f'p{percentile}'] = values
+
+    return summary_df
+
+def squad_points_distribution(samples, percentiles=DEFAULT_PERCENTILES):
+    """
+    Get the distribution of total squad points across trials
+
+    Returns:
+        Tuple of (total points per trial, dictionary of percentile to points)
+    """
+    totals = samples.sum(axis=1)
+    if len(totals) == 0:
+        return totals, {}
+    return totals, dict(zip(percentiles, np.percentile(totals, percentiles)))
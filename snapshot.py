@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from functools import lru_cache
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import requests
+
+# Snapshots are plain Arrow IPC files, one per table, in a versioned
+# subdirectory, plus a small JSON file with the top-level bootstrap scalars
+# that names the current version and the tables it holds
+SNAPSHOT_DIR_ENV = "FPL_SNAPSHOT_DIR"
+OFFLINE_ENV = "FPL_OFFLINE"
+DEFAULT_SNAPSHOT_DIR = "snapshot"
+META_FILE = "meta.json"
+
+BOOTSTRAP_TABLES = ['elements', 'teams', 'element_types', 'events']
+FIXTURES_TABLE = 'fixtures'
+HISTORY_TABLE = 'history'
+
+def get_snapshot_dir():
+    """
+    Get the snapshot directory from FPL_SNAPSHOT_DIR, or the default
+    """
+    return os.environ.get(SNAPSHOT_DIR_ENV, DEFAULT_SNAPSHOT_DIR)
+
+def is_offline():
+    """
+    Check whether FPL_OFFLINE is set, in which case the API is never called
+    """
+    return os.environ.get(OFFLINE_ENV, "").lower() in ("1", "true", "yes")
+
+def snapshot_exists(snapshot_dir=None):
+    """
+    Check whether a snapshot has been written to the directory
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    return os.path.exists(os.path.join(snapshot_dir, META_FILE))
+
+def _table_path(table_dir, name):
+    return os.path.join(table_dir, f"{name}.arrow")
+
+def _table_dir(snapshot_dir, meta):
+    # Snapshots written before versioning keep their tables next to meta.json
+    version = meta.get('version')
+    return os.path.join(snapshot_dir, version) if version else snapshot_dir
+
+def _flat_records(records):
+    """
+    Drop nested list/dict fields, which the dashboard does not use and which
+    do not have a stable Arrow type across rows
+    """
+    nested = {
+        key
+        for record in records
+        for key, value in record.items()
+        if isinstance(value, (list, dict))
+    }
+    return [{key: value for key, value in record.items() if key not in nested} for record in records]
+
+def write_table(table_dir, name, records):
+    """
+    Write a list of records as an uncompressed Arrow IPC file
+
+    Files are left uncompressed so they can be memory-mapped on load.
+    """
+    table = pa.Table.from_pylist(_flat_records(records))
+    feather.write_feather(table, _table_path(table_dir, name), compression='uncompressed')
+
+def snapshot_version(snapshot_dir):
+    """
+    Get a token that changes whenever the snapshot is refreshed
+
+    meta.json is replaced last on every refresh, so its modification time
+    identifies the snapshot currently on disk.
+    """
+    try:
+        return os.stat(os.path.join(snapshot_dir, META_FILE)).st_mtime_ns
+    except OSError:
+        return None
+
+# Caches are keyed on the snapshot version, so a refresh by another process
+# is picked up on the next load without restarting the app
+@lru_cache(maxsize=32)
+def _read_table(snapshot_dir, name, version):
+    meta = _read_meta(snapshot_dir, version)
+    tables = meta.get('tables')
+    if tables is not None and name not in tables:
+        return None
+    path = _table_path(_table_dir(snapshot_dir, meta), name)
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+@lru_cache(maxsize=8)
+def _read_meta(snapshot_dir, version):
+    path = os.path.join(snapshot_dir, META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def read_table(snapshot_dir, name):
+    """
+    Memory-map one snapshot table
+
+    Returns:
+        pyarrow Table, or None if the table is not in the snapshot
+    """
+    return _read_table(snapshot_dir, name, snapshot_version(snapshot_dir))
+
+def read_meta(snapshot_dir):
+    """
+    Read the snapshot metadata, or an empty dict if there is none
+    """
+    return _read_meta(snapshot_dir, snapshot_version(snapshot_dir))
+
+def load_bootstrap_snapshot(snapshot_dir=None):
+    """
+    Rebuild the bootstrap-static payload from a snapshot
+
+    Returns:
+        Dictionary shaped like the bootstrap API response, or None if no snapshot exists
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    if not snapshot_exists(snapshot_dir):
+        return None
+
+    bootstrap_data = dict(read_meta(snapshot_dir).get('bootstrap', {}))
+    for name in BOOTSTRAP_TABLES:
+        table = read_table(snapshot_dir, name)
+        bootstrap_data[name] = table.to_pylist() if table is not None else []
+    return bootstrap_data
+
+def load_fixtures_snapshot(snapshot_dir=None):
+    """
+    Load fixture data from a snapshot, or None if no snapshot exists
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    if not snapshot_exists(snapshot_dir):
+        return None
+
+    table = read_table(snapshot_dir, FIXTURES_TABLE)
+    return table.to_pylist() if table is not None else []
+
+@lru_cache(maxsize=4)
+def _history_by_player(snapshot_dir, version):
+    table = _read_table(snapshot_dir, HISTORY_TABLE, version)
+    history = {}
+    if table is None:
+        return history
+    for row in table.to_pylist():
+        history.setdefault(row['element'], []).append(row)
+    return history
+
+def load_player_history_snapshot(player_id, snapshot_dir=None):
+    """
+    Load a player's element-summary payload from a snapshot
+
+    Returns:
+        Dictionary with a 'history' list, or None if the snapshot has no history for the player
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir()
+    if not snapshot_exists(snapshot_dir):
+        return None
+
+    history = _history_by_player(snapshot_dir, snapshot_version(snapshot_dir)).get(player_id)
+    if history is None:
+        return None
+    return {'history': history, 'history_past': [], 'fixtures': []}
+
+def refresh_snapshot(snapshot_dir, with_history=False, delay=0.1):
+    """
+    Fetch the FPL API and write a fresh snapshot
+
+    Tables are written into a new versioned subdirectory and meta.json is
+    then replaced to point at it, so readers see either the old snapshot or
+    the new one, never a mix. Player history is only part of the new
+    snapshot when with_history is set. Older versions are deleted afterwards.
+
+    Args:
+        snapshot_dir: Directory to write into, created if needed
+        with_history: Also fetch element-summary history for every player
+        delay: Seconds to wait between element-summary requests
+
+    Raises:
+        requests.exceptions.RequestException: If any request fails
+    """
+    from fpl_api import BOOTSTRAP_URL, FIXTURES_URL, PLAYER_HISTORY_URL
+
+    response = requests.get(BOOTSTRAP_URL)
+    response.raise_for_status()
+    bootstrap_data = response.json()
+
+    response = requests.get(FIXTURES_URL)
+    response.raise_for_status()
+    fixtures_data = response.json()
+
+    history_rows = None
+    if with_history:
+        history_rows = []
+        for player in bootstrap_data.get('elements', []):
+            response = requests.get(f"{PLAYER_HISTORY_URL}{player['id']}/")
+            response.raise_for_status()
+            history_rows.extend(response.json().get('history', []))
+            time.sleep(delay)
+
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    table_dir = os.path.join(snapshot_dir, version)
+    os.makedirs(table_dir)
+
+    tables = BOOTSTRAP_TABLES + [FIXTURES_TABLE]
+    for name in BOOTSTRAP_TABLES:
+        write_table(table_dir, name, bootstrap_data.get(name, []))
+    write_table(table_dir, FIXTURES_TABLE, fixtures_data)
+    if history_rows is not None:
+        write_table(table_dir, HISTORY_TABLE, history_rows)
+        tables.append(HISTORY_TABLE)
+
+    meta = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'version': version,
+        'tables': tables,
+        'bootstrap': {
+            key: value
+            for key, value in bootstrap_data.items()
+            if key not in BOOTSTRAP_TABLES and not isinstance(value, (list, dict))
+        },
+    }
+    meta_path = os.path.join(snapshot_dir, META_FILE)
+    with open(f"{meta_path}.tmp", 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+    _remove_stale_versions(snapshot_dir, version)
+
+def _remove_stale_versions(snapshot_dir, current_version):
+    """
+    Delete table directories and unversioned tables not used by the current snapshot
+    """
+    for entry in os.scandir(snapshot_dir):
+        if entry.is_dir() and entry.name.startswith('v') and entry.name != current_version:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        elif entry.is_file() and entry.name.endswith('.arrow'):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the offline FPL data snapshot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    refresh_parser = subparsers.add_parser('refresh', help="Fetch the FPL API and write a fresh snapshot")
+    refresh_parser.add_argument('--dir', default=get_snapshot_dir(), help="Snapshot directory")
+    refresh_parser.add_argument('--with-history', action='store_true', help="Also fetch every player's gameweek history")
+
+    info_parser = subparsers.add_parser('info', help="Show the tables in an existing snapshot")
+    info_parser.add_argument('--dir', default=get_snapshot_dir(), help="Snapshot directory")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'refresh':
+        try:
+            refresh_snapshot(args.dir, with_history=args.with_history)
+        except requests.exceptions.RequestException as e:
+            print(f"Error refreshing snapshot: {str(e)}", file=sys.stderr)
+            return 1
+        print(f"Snapshot written to {args.dir}")
+        return 0
+
+    if not snapshot_exists(args.dir):
+        print(f"No snapshot found in {args.dir}", file=sys.stderr)
+        return 1
+    print(f"Snapshot created at {read_meta(args.dir).get('created_at', 'unknown')}")
+    for name in BOOTSTRAP_TABLES + [FIXTURES_TABLE, HISTORY_TABLE]:
+        table = read_table(args.dir, name)
+        if table is not None:
+            print(f"  {name}: {table.num_rows} rows, {table.num_columns} columns")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
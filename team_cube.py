@@ -0,0 +1,284 @@
+import copy
+import threading
+
+import numpy as np
+import pandas as pd
+from utils import safe_ratio
+
+POSITION_ORDER = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+
+# Processed player columns aggregated into the cube
+CUBE_METRICS = [
+    'total_points',
+    'goals_scored',
+    'assists',
+    'clean_sheets',
+    'goals_conceded',
+    'saves',
+    'bonus',
+    'minutes',
+    'yellow_cards',
+    'red_cards',
+    'influence',
+    'creativity',
+    'threat',
+    'ict_index',
+    'price',
+]
+
+class TeamAggregateCube:
+    """
+    Team x position x metric sums over the processed player table
+
+    Sums and player counts are held in dense NumPy arrays, so slices and
+    rollups never touch the player rows. Each player's contribution is kept
+    alongside, so changed rows are applied by subtracting the old values and
+    adding the new ones.
+    """
+
+    def __init__(self, teams=(), positions=POSITION_ORDER, metrics=CUBE_METRICS):
+        self.teams = []
+        self.positions = []
+        self.metrics = list(metrics)
+        self._team_index = {}
+        self._position_index = {}
+        self._metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+
+        self.values = np.zeros((0, 0, len(self.metrics)))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+
+        self._player_rows = {}
+        self._player_team = np.zeros(0, dtype=np.int64)
+        self._player_position = np.zeros(0, dtype=np.int64)
+        self._player_values = np.zeros((0, len(self.metrics)))
+        self._player_active = np.zeros(0, dtype=bool)
+        self._read_only = False
+
+        self._index_labels(teams, 'team')
+        self._index_labels(positions, 'position')
+
+    @classmethod
+    def from_players(cls, players_df, metrics=CUBE_METRICS):
+        """
+        Build a cube from a processed player DataFrame
+        """
+        if players_df.empty:
+            return cls(metrics=metrics)
+
+        present = set(players_df['position'])
+        positions = [p for p in POSITION_ORDER if p in present] + sorted(present - set(POSITION_ORDER))
+        cube = cls(sorted(players_df['team_name'].unique()), positions, metrics)
+        cube.upsert(players_df)
+        return cube
+
+    def read_only_view(self):
+        """
+        Get a read-only copy of the aggregates that later updates do not affect
+
+        Only the team x position sums and counts are copied; the per-player
+        contributions are left behind, as a view cannot be updated.
+        """
+        view = copy.copy(self)
+        view.teams = list(self.teams)
+        view.positions = list(self.positions)
+        view._team_index = dict(self._team_index)
+        view._position_index = dict(self._position_index)
+        view.values = self.values.copy()
+        view.counts = self.counts.copy()
+        view.values.flags.writeable = False
+        view.counts.flags.writeable = False
+        view._read_only = True
+        return view
+
+    def _check_writable(self):
+        if self._read_only:
+            raise ValueError("Cannot update a read-only cube view")
+
+    def _index_labels(self, labels, axis):
+        """
+        Map labels to indices along the team or position axis, growing the cube for new labels
+        """
+        names, index = (self.teams, self._team_index) if axis == 'team' else (self.positions, self._position_index)
+        labels = list(labels)
+        new_labels = list(dict.fromkeys(label for label in labels if label not in index))
+        if new_labels:
+            for label in new_labels:
+                index[label] = len(names)
+                names.append(label)
+            shape = (len(self.teams), len(self.positions))
+            values = np.zeros(shape + (len(self.metrics),))
+            counts = np.zeros(shape, dtype=np.int64)
+            values[:self.values.shape[0], :self.values.shape[1]] = self.values
+            counts[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+            self.values, self.counts = values, counts
+        return np.array([index[label] for label in labels], dtype=np.int64)
+
+    def _apply(self, rows, sign):
+        team_idx = self._player_team[rows]
+        position_idx = self._player_position[rows]
+        np.add.at(self.values, (team_idx, position_idx), sign * self._player_values[rows])
+        np.add.at(self.counts, (team_idx, position_idx), sign)
+
+    def upsert(self, players_df):
+        """
+        Add new players and apply changed rows for players already in the cube
+
+        Args:
+            players_df: Processed player rows with 'id', 'team_name', 'position'
+                and every cube metric column
+        """
+        self._check_writable()
+        players_df = players_df.drop_duplicates(subset='id', keep='last')
+        if players_df.empty:
+            return
+
+        team_idx = self._index_labels(players_df['team_name'], 'team')
+        position_idx = self._index_labels(players_df['position'], 'position')
+        values = players_df[self.metrics].to_numpy(dtype=float)
+
+        rows = np.array([self._player_rows.get(player_id, -1) for player_id in players_df['id']], dtype=np.int64)
+        is_new = rows < 0
+
+        existing_rows = rows[~is_new]
+        existing_rows = existing_rows[self._player_active[existing_rows]]
+        self._apply(existing_rows, -1)
+
+        new_rows = np.arange(is_new.sum()) + len(self._player_active)
+        for player_id, row in zip(players_df['id'][is_new], new_rows):
+            self._player_rows[player_id] = row
+        rows[is_new] = new_rows
+
+        self._player_team = np.concatenate([self._player_team, np.zeros(len(new_rows), dtype=np.int64)])
+        self._player_position = np.concatenate([self._player_position, np.zeros(len(new_rows), dtype=np.int64)])
+        self._player_values = np.concatenate([self._player_values, np.zeros((len(new_rows), len(self.metrics)))])
+        self._player_active = np.concatenate([self._player_active, np.zeros(len(new_rows), dtype=bool)])
+
+        self._player_team[rows] = team_idx
+        self._player_position[rows] = position_idx
+        self._player_values[rows] = values
+        self._player_active[rows] = True
+        self._apply(rows, 1)
+
+    def remove(self, player_ids):
+        """
+        Remove players' contributions from the cube
+        """
+        self._check_writable()
+        rows = np.array([self._player_rows.get(player_id, -1) for player_id in player_ids], dtype=np.int64)
+        rows = rows[rows >= 0]
+        rows = rows[self._player_active[rows]]
+        self._apply(rows, -1)
+        self._player_active[rows] = False
+
+    def _select(self, teams, positions, metrics):
+        team_names = self.teams if teams is None else list(teams)
+        position_names = self.positions if positions is None else list(positions)
+        metric_names = self.metrics if metrics is None else list(metrics)
+        team_idx = [self._team_index[team] for team in team_names]
+        position_idx = [self._position_index[position] for position in position_names]
+        metric_idx = [self._metric_index[metric] for metric in metric_names]
+        return team_names, position_names, metric_names, team_idx, position_idx, metric_idx
+
+    def slice(self, teams=None, positions=None, metrics=None):
+        """
+        Get cube cells for a subset of teams, positions and metrics
+
+        Returns:
+            DataFrame indexed by (team, position) with a 'players' count and one column per metric
+        """
+        team_names, position_names, metric_names, team_idx, position_idx, metric_idx = self._select(teams, positions, metrics)
+        values = self.values[np.ix_(team_idx, position_idx, metric_idx)]
+        counts = self.counts[np.ix_(team_idx, position_idx)]
+
+        index = pd.MultiIndex.from_product([team_names, position_names], names=['team', 'position'])
+        slice_df = pd.DataFrame(values.reshape(-1, len(metric_names)), index=index, columns=metric_names)
+        slice_df.insert(0, 'players', counts.reshape(-1))
+        return slice_df
+
+    def rollup(self, by='team', teams=None, positions=None, metrics=None, agg='sum'):
+        """
+        Aggregate the cube along the team or position axis
+
+        Args:
+            by: 'team' or 'position', the axis kept in the result
+            teams: Teams to include, defaults to all
+            positions: Positions to include, defaults to all
+            metrics: Metrics to include, defaults to all
+            agg: 'sum' for totals or 'mean' for per-player averages
+
+        Returns:
+            DataFrame indexed by team or position with a 'players' count and one column per metric
+        """
+        team_names, position_names, metric_names, team_idx, position_idx, metric_idx = self._select(teams, positions, metrics)
+        values = self.values[np.ix_(team_idx, position_idx, metric_idx)]
+        counts = self.counts[np.ix_(team_idx, position_idx)]
+
+        axis = 1 if by == 'team' else 0
+        totals = values.sum(axis=axis)
+        players = counts.sum(axis=axis)
+        if agg == 'mean':
+            totals = safe_ratio(totals, players[:, None])
+
+        labels = team_names if by == 'team' else position_names
+        rollup_df = pd.DataFrame(totals, index=pd.Index(labels, name=by), columns=metric_names)
+        rollup_df.insert(0, 'players', players)
+        return rollup_df
+
+# The cube, the per-row hashes of the player table it was built from and
+# the data version and read-only view handed to sessions, shared by every
+# Streamlit session
+_cube_lock = threading.Lock()
+_cube = None
+_cube_row_hashes = None
+_cube_view = (None, None)
+
+def _row_hashes(players_df):
+    """
+    Hash the cube-relevant columns of each player row, indexed by player id
+    """
+    rows = players_df.set_index('id')[['team_name', 'position'] + CUBE_METRICS]
+    return pd.util.hash_pandas_object(rows, index=False)
+
+def get_team_cube(players_df, data_version):
+    """
+    Get the team aggregate cube for the processed player table
+
+    While data_version is unchanged the same view is returned without
+    looking at the rows. When it changes, only rows whose hash differs from
+    the previous table are applied with upsert, and players no longer in the
+    table are removed.
+
+    Args:
+        players_df: Processed player DataFrame
+        data_version: Token identifying the data players_df was built from,
+            e.g. fpl_api.get_data_version()
+
+    Returns:
+        Read-only TeamAggregateCube shared by every session
+    """
+    global _cube, _cube_row_hashes, _cube_view
+
+    version, view = _cube_view
+    if view is not None and version == data_version:
+        return view
+
+    with _cube_lock:
+        version, view = _cube_view
+        if view is not None and version == data_version:
+            return view
+
+        players_df = players_df.drop_duplicates(subset='id', keep='last')
+        row_hashes = _row_hashes(players_df)
+        if _cube is None:
+            _cube = TeamAggregateCube.from_players(players_df)
+        elif not row_hashes.equals(_cube_row_hashes):
+            previous = _cube_row_hashes.reindex(row_hashes.index)
+            changed_ids = row_hashes.index[previous.isna() | (previous != row_hashes)]
+            removed_ids = _cube_row_hashes.index.difference(row_hashes.index)
+            _cube.upsert(players_df[players_df['id'].isin(changed_ids)])
+            _cube.remove(removed_ids)
+        _cube_row_hashes = row_hashes
+
+        view = _cube.read_only_view()
+        _cube_view = (data_version, view)
+        return view
@@ -1,5 +1,5 @@
 import requests
-import streamlit as st
+import numpy as np
 from typing import Dict, List, Tuple, Optional, Union, Any
 
 def filter_players(
@@ -58,6 +58,8 @@ def display_player_image(player_id: int) -> None:
     Args:
         player_id: The player's ID
     """
+    import streamlit as st
+
     # Sample avatar icon from Font Awesome as a placeholder
     st.markdown(f"""
         <div style='text-align: center;'>
@@ -98,6 +100,23 @@ def calculate_player_value(points: int, price: float) -> float:
         return 0
     return points / price
 
+def safe_ratio(numerator: Any, denominator: Any) -> np.ndarray:
+    """
+    Element-wise division that returns 0 where the denominator is 0
+    
+    Args:
+        numerator: Array-like of numerators
+        denominator: Array-like or scalar of denominators, broadcast against the numerator
+        
+    Returns:
+        Array of float ratios
+    """
+    numerator, denominator = np.broadcast_arrays(
+        np.asarray(numerator, dtype=float),
+        np.asarray(denominator, dtype=float)
+    )
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0)
+
 def format_fixture(fixture: Dict[str, Any], team_names: Dict[int, str]) -> str:
     """
     Format a fixture into a readable string
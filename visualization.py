@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 from fpl_api import get_player_history
+from metrics import build_history_frame, add_rolling_metrics
 
 def plot_player_history(player_id):
     """
@@ -26,7 +27,7 @@ def plot_player_history(player_id):
         )
         return fig
     
-    history_df = pd.DataFrame(history_data['history'])
+    history_df = add_rolling_metrics(build_history_frame(history_data['history']))
     
     fig = go.Figure()
     
@@ -39,6 +40,14 @@ def plot_player_history(player_id):
         marker=dict(size=8, color='#37003c')
     ))
     
+    fig.add_trace(go.Scatter(
+        x=history_df['round'],
+        y=history_df['ewm_form'],
+        mode='lines',
+        name='Form (EWM)',
+        line=dict(color='#e90052', width=2)
+    ))
+    
     fig.add_trace(go.Scatter(
         x=history_df['round'],
         y=history_df['minutes'],
@@ -205,4 +214,393 @@ def plot_team_strength_comparison(teams_data):
         height=500
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+def plot_rolling_form(rolling_df, players_df, max_players=10):
+    """
+    Plot exponentially weighted form by gameweek for the top players in form
+    
+    Args:
+        rolling_df: Long-format history with rolling metric columns
+        players_df: DataFrame of player data used for player names
+        max_players: Maximum number of players to draw
+        
+    Returns:
+        Plotly figure object
+    """
+    if rolling_df.empty:
+        fig = go.Figure()
+        fig.update_layout(
+            title="No historical data available",
+            xaxis_title="Gameweek",
+            yaxis_title="Form (EWM)"
+        )
+        return fig
+    
+    latest_form = rolling_df.groupby('element')['ewm_form'].last()
+    top_ids = latest_form.nlargest(max_players).index
+    
+    df = rolling_df[rolling_df['element'].isin(top_ids)].copy()
+    df['name'] = df['element'].map(players_df.set_index('id')['name'])
+    
+    fig = px.line(
+        df,
+        x='round',
+        y='ewm_form',
+        color='name',
+        markers=True,
+        labels={
+            'round': 'Gameweek',
+            'ewm_form': 'Form (EWM)',
+            'name': 'Player'
+        },
+        title='Rolling Form of Players in Best Form'
+    )
+    
+    fig.update_layout(
+        xaxis=dict(title='Gameweek', gridcolor='rgba(0,0,0,0.1)'),
+        yaxis=dict(title='Form (EWM)', gridcolor='rgba(0,0,0,0.1)'),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        hovermode='x unified',
+        height=500
+    )
+    
+    return fig
+
+def plot_per_90_leaders(players_df, metric='points_per_90', min_minutes=270, max_players=20):
+    """
+    Create a bar chart of the players with the highest per-90 rate for a metric
+    
+    Args:
+        players_df: DataFrame of player data including metric columns
+        metric: Name of the per-90 metric column to rank by
+        min_minutes: Minimum minutes played to be included
+        max_players: Maximum number of players to show
+        
+    Returns:
+        Plotly figure object
+    """
+    position_colors = {
+        'Goalkeeper': '#FFC107',
+        'Defender': '#2196F3',
+        'Midfielder': '#4CAF50',
+        'Forward': '#F44336'
+    }
+    
+    metric_label = metric.replace('_', ' ').title()
+    
+    if metric not in players_df.columns:
+        df = players_df.iloc[0:0]
+    else:
+        df = players_df[players_df['minutes'] >= min_minutes].dropna(subset=[metric])
+    
+    if df.empty:
+        fig = go.Figure()
+        fig.update_layout(
+            title="No per 90 data available",
+            xaxis_title="Player",
+            yaxis_title=metric_label
+        )
+        return fig
+    
+    df = df.nlargest(max_players, metric)
+    
+    fig = px.bar(
+        df,
+        x='name',
+        y=metric,
+        color='position',
+        color_discrete_map=position_colors,
+        hover_data=['team_name', 'minutes', 'price'],
+        labels={
+            'name': 'Player',
+            metric: metric_label,
+            'position': 'Position'
+        },
+        title=f'{metric_label} Leaders (min. {min_minutes} minutes)'
+    )
+    
+    fig.update_layout(
+        xaxis=dict(title='Player', categoryorder='total descending'),
+        yaxis=dict(title=metric_label, gridcolor='rgba(0,0,0,0.1)'),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        height=500
+    )
+    
+    return fig
+
+def plot_price_change_predictions(players_df, max_players=10):
+    """
+    Create a bar chart of the likeliest price risers and fallers
+    
+    Args:
+        players_df: DataFrame of player data including price prediction columns
+        max_players: Number of risers and of fallers to show
+        
+    Returns:
+        Plotly figure object
+    """
+    prediction_colors = {
+        'Rise': '#00ff87',
+        'Hold': '#9e9e9e',
+        'Fall': '#e90052'
+    }
+    
+    df = players_df.dropna(subset=['projected_transfer_ratio'])
+    df = pd.concat([
+        df.nlargest(max_players, 'projected_transfer_ratio'),
+        df.nsmallest(max_players, 'projected_transfer_ratio')
+    ]).drop_duplicates(subset='id')
+    df = df.sort_values('projected_transfer_ratio')
+    
+    fig = px.bar(
+        df,
+        x='projected_transfer_ratio',
+        y='name',
+        color='prediction',
+        orientation='h',
+        color_discrete_map=prediction_colors,
+        hover_data=[
+            'team_name',
+            'price',
+            'selected_by_percent',
+            'transfers_in_event',
+            'transfers_out_event',
+            'net_transfers_since_change',
+            'cost_change_event'
+        ],
+        labels={
+            'projected_transfer_ratio': 'Projected Net Transfers / Owners',
+            'name': 'Player',
+            'prediction': 'Prediction',
+            'transfers_in_event': 'Transfers In (GW)',
+            'transfers_out_event': 'Transfers Out (GW)',
+            'net_transfers_since_change': 'Net Since Last Change',
+            'cost_change_event': 'Price Change (GW)'
+        },
+        title='Price Change Watch'
+    )
+    
+    fig.update_layout(
+        xaxis=dict(title='Projected Net Transfers / Owners', tickformat='.1%', gridcolor='rgba(0,0,0,0.1)'),
+        yaxis=dict(title='Player', categoryorder='array', categoryarray=list(df['name'])),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        height=600
+    )
+    
+    return fig
+
+def plot_squad_points_distribution(squad_totals, percentiles):
+    """
+    Create a histogram of simulated total squad points
+    
+    Args:
+        squad_totals: Simulated squad points per trial
+        percentiles: Dictionary of percentile to points, drawn as vertical lines
+        
+    Returns:
+        Plotly figure object
+    """
+    fig = go.Figure()
+    
+    fig.add_trace(go.Histogram(
+        x=squad_totals,
+        histnorm='probability',
+        name='Trials',
+        marker_color='#37003c',
+        opacity=0.8
+    ))
+    
+    for percentile, points in percentiles.items():
+        fig.add_vline(
+            x=points,
+            line=dict(color='#00ff87', width=2, dash='dash'),
+            annotation_text=f"P{percentile}: {points:.0f}",
+            annotation_position="top"
+        )
+    
+    fig.update_layout(
+        title=f'Simulated Squad Points ({len(squad_totals):,} trials)',
+        xaxis=dict(title='Total Points', gridcolor='rgba(0,0,0,0.1)'),
+        yaxis=dict(title='Probability', tickformat='.0%', gridcolor='rgba(0,0,0,0.1)'),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        showlegend=False,
+        height=400
+    )
+    
+    return fig
+
+def plot_player_points_ranges(summary_df, players_df):
+    """
+    Plot each player's simulated median points with a P10 to P90 range
+    
+    Args:
+        summary_df: Per-player simulation summary indexed by player id
+        players_df: DataFrame of player data used for player names
+        
+    Returns:
+        Plotly figure object
+    """
+    df = summary_df.join(players_df.set_index('id')[['name', 'position']])
+    df = df.sort_values('mean_points', ascending=False)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=df['name'],
+        y=df['p50'],
+        mode='markers',
+        name='Median',
+        marker=dict(size=10, color='#37003c'),
+        error_y=dict(
+            type='data',
+            symmetric=False,
+            array=df['p90'] - df['p50'],
+            arrayminus=df['p50'] - df['p10'],
+            color='#37003c'
+        )
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=df['name'],
+        y=df['mean_points'],
+        mode='markers',
+        name='Mean',
+        marker=dict(size=8, color='#00ff87', symbol='diamond')
+    ))
+    
+    fig.update_layout(
+        title='Simulated Points per Player (P10 to P90)',
+        xaxis_title='Player',
+        yaxis=dict(title='Points', gridcolor='rgba(0,0,0,0.1)'),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        height=400
+    )
+    
+    return fig
+
+def plot_team_position_breakdown(team_cube, metric='total_points', teams=None):
+    """
+    Create a stacked bar chart of a metric per team, split by position
+    
+    Args:
+        team_cube: TeamAggregateCube built from the processed player table
+        metric: Cube metric to show
+        teams: Teams to include, defaults to all
+        
+    Returns:
+        Plotly figure object
+    """
+    position_colors = {
+        'Goalkeeper': '#FFC107',
+        'Defender': '#2196F3',
+        'Midfielder': '#4CAF50',
+        'Forward': '#F44336'
+    }
+    
+    df = team_cube.slice(teams=teams, metrics=[metric]).reset_index()
+    metric_label = metric.replace('_', ' ').title()
+    
+    fig = px.bar(
+        df,
+        x='team',
+        y=metric,
+        color='position',
+        color_discrete_map=position_colors,
+        hover_data=['players'],
+        labels={
+            'team': 'Team',
+            metric: metric_label,
+            'position': 'Position',
+            'players': 'Players'
+        },
+        title=f'{metric_label} by Team and Position'
+    )
+    
+    fig.update_layout(
+        xaxis=dict(title='Team', categoryorder='total descending'),
+        yaxis=dict(title=metric_label, gridcolor='rgba(0,0,0,0.1)'),
+        barmode='stack',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        height=500
+    )
+    
+    return fig
+
+def plot_team_output_comparison(team_cube, teams_data, metric='goals_scored'):
+    """
+    Compare team output for a metric against the teams' static attack strength
+    
+    Args:
+        team_cube: TeamAggregateCube built from the processed player table
+        teams_data: List of team data from FPL API
+        metric: Cube metric to compare
+        
+    Returns:
+        Plotly figure object
+    """
+    teams_df = pd.DataFrame(teams_data).set_index('name')
+    rollup_df = team_cube.rollup(by='team', metrics=[metric])
+    rollup_df = rollup_df.join(teams_df[['strength_attack_home', 'strength_attack_away']], how='left')
+    rollup_df['attack_strength'] = rollup_df[['strength_attack_home', 'strength_attack_away']].mean(axis=1)
+    rollup_df = rollup_df.reset_index()
+    metric_label = metric.replace('_', ' ').title()
+    
+    fig = px.scatter(
+        rollup_df,
+        x='attack_strength',
+        y=metric,
+        text='team',
+        hover_data=['players'],
+        labels={
+            'attack_strength': 'Average Attack Strength',
+            metric: metric_label,
+            'team': 'Team',
+            'players': 'Players'
+        },
+        title=f'Team {metric_label} vs Attack Strength'
+    )
+    
+    fig.update_traces(
+        textposition='top center',
+        textfont=dict(size=10),
+        marker=dict(size=12, color='#37003c', opacity=0.8)
+    )
+    
+    fig.update_layout(
+        xaxis=dict(title='Average Attack Strength', gridcolor='rgba(0,0,0,0.1)'),
+        yaxis=dict(title=metric_label, gridcolor='rgba(0,0,0,0.1)'),
+        plot_bgcolor='rgba(0,0,0,0.02)',
+        hovermode='closest',
+        height=500
+    )
+    
+    return fig